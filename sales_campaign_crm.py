@@ -1,15 +1,24 @@
 import os
+import sys
 import gspread
 import smtplib
 from email.mime.text import MIMEText
 import dns.resolver
+import dns.asyncresolver
+import asyncio
 import re
 import time
-import schedule
-from datetime import datetime
+import random
+import itertools
+import signal
+from datetime import datetime, timedelta
 import queue
 import threading
 import logging
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httplib2
+import google_auth_httplib2
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 
@@ -21,39 +30,102 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Gmail API allows at most 100 calls per batch request
+BATCH_SIZE = 100
+
+# Timing out API calls on each thread's keep-alive HTTP connection after this many seconds
+HTTP_TIMEOUT = 30
+
+# Compiling the email syntax pattern once for the verification hot path
+EMAIL_SYNTAX = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+
+# Flushing buffered sheet writes after this many leads or seconds
+FLUSH_EVERY_LEADS = 10
+FLUSH_INTERVAL = 5
+
+# Bounding the MX lookup cache and setting fallback TTLs in seconds
+MX_CACHE_SIZE = 1000
+MX_DEFAULT_TTL = 300
+MX_NEGATIVE_TTL = 60
+
+# Bounding pending verification tasks, fallback per-lead lookups and batch size
+VERIFICATION_QUEUE_SIZE = 1000
+VERIFICATION_WORKERS = 16
+VERIFICATION_BATCH_SIZE = 100
+
+# Reconnecting SMTP after this many messages or probing it after this many idle seconds
+SMTP_MESSAGES_PER_CONNECTION = 100
+SMTP_IDLE_CHECK = 60
+
+# Default number of concurrent outreach senders
+OUTREACH_WORKERS = 8
+
+# Giving up on an outreach email after this many failed sends
+MAX_SEND_ATTEMPTS = 3
+
 class Gmail:
     def __init__(self, credentials):
         """Initializeing Gmail API service"""
-        self.service = build("gmail", "v1", credentials=credentials)
+        self.credentials = credentials
+        self._local = threading.local() # Per-thread services, as httplib2 is not thread-safe
+    
+    @property
+    def service(self):
+        """Returning this thread's Gmail service, building it on first use."""
+        service = getattr(self._local, "service", None)
+        if service is None:
+            service = self._local.service = self._build_service()
+        return service
+    
+    def _build_service(self):
+        # Reusing one authorized keep-alive connection for every Gmail call on the calling thread
+        http = google_auth_httplib2.AuthorizedHttp(
+            self.credentials,
+            http=httplib2.Http(timeout=HTTP_TIMEOUT)
+        )
+        return build("gmail", "v1", http=http, cache_discovery=False)
     
     def get_unread_messages(self, query=""):
         """Fetching unread messages matching the query"""
         try:
             # Adding "is:unread" to the query
             full_query = f"is:unread {query}".strip()
+            service = self.service # Looking up this thread's service once
             
-            # Calling the Gmail API
-            results = self.service.users().messages().list(
+            # Calling the Gmail API, asking only for the message IDs of one batch
+            results = service.users().messages().list(
                 userId="me",
-                q=full_query
+                q=full_query,
+                maxResults=BATCH_SIZE,
+                fields="messages/id,nextPageToken"
             ).execute()
             
             messages = results.get("messages", [])
+            message_ids = [message["id"] for message in messages]
             
-            # Fetching full message details
+            # Fetching message headers in batches instead of one request per message
             full_messages = []
-            for message in messages:
-                msg = self.service.users().messages().get(
-                    userId="me",
-                    id=message["id"]
-                ).execute()
-                full_messages.append(msg)
-                
-                # Marking message as read
-                self.service.users().messages().modify(
+            fetched_ids = []
+            for start in range(0, len(message_ids), BATCH_SIZE):
+                chunk = message_ids[start:start + BATCH_SIZE]
+                batch = service.new_batch_http_request(
+                    callback=self._collect_message(full_messages, fetched_ids)
+                )
+                for message_id in chunk:
+                    batch.add(service.users().messages().get(
+                        userId="me",
+                        id=message_id,
+                        format="metadata", # Skipping message bodies until tasks are parsed from them
+                        metadataHeaders=["Subject", "From"],
+                        fields="id,snippet,payload/headers"
+                    ))
+                batch.execute()
+            
+            # Marking only successfully fetched messages as read, so failed ones are retried next poll
+            if fetched_ids:
+                service.users().messages().batchModify(
                     userId="me",
-                    id=message["id"],
-                    body={"removeLabelIds": ["UNREAD"]}
+                    body={"ids": fetched_ids, "removeLabelIds": ["UNREAD"]}
                 ).execute()
             
             return full_messages
@@ -61,56 +133,172 @@ class Gmail:
         except Exception as e:
             logger.error(f"Error fetching Gmail messages: {str(e)}")
             return []
+    
+    @staticmethod
+    def _collect_message(full_messages, fetched_ids):
+        # Building a batch callback that collects each fetched message and its ID
+        def callback(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error fetching Gmail message {request_id}: {str(exception)}")
+                return
+            full_messages.append(response)
+            fetched_ids.append(response["id"])
+        return callback
 
 class TaskQueue:
     """Thread-safe task queue for managing lead processing"""
     def __init__(self):
         # Queuing for verification and outreach tasks
-        self.verification_queue = queue.Queue()
+        self.verification_queue = queue.Queue(maxsize=VERIFICATION_QUEUE_SIZE)
         self.outreach_queue = queue.Queue()
         
-    def add_verification_task(self, lead):
-        # Adding lead to verification queue
-        self.verification_queue.put(lead)
+    def add_verification_task(self, lead, timeout=None):
+        # Adding lead to verification queue, returning False if it stayed full for timeout seconds
+        try:
+            self.verification_queue.put(lead, timeout=timeout)
+        except queue.Full:
+            return False
+        return True
         
     def add_outreach_task(self, lead):
         # Adding lead to outreach queue
         self.outreach_queue.put(lead)
         
-    def get_verification_task(self):
-        # Getting next verification lead if available
-        return self.verification_queue.get() if not self.verification_queue.empty() else None
+    def get_verification_task(self, timeout=1.0):
+        # Waiting up to timeout seconds for the next verification lead
+        return self._get(self.verification_queue, timeout)
+        
+    def get_outreach_task(self, timeout=1.0):
+        # Waiting up to timeout seconds for the next outreach lead
+        return self._get(self.outreach_queue, timeout)
+        
+    def get_verification_batch(self, max_size, timeout=1.0):
+        # Waiting for the next verification lead, then draining up to max_size leads
+        lead = self.get_verification_task(timeout)
+        if lead is None:
+            return []
+        batch = [lead]
+        while len(batch) < max_size:
+            try:
+                lead = self.verification_queue.get_nowait()
+            except queue.Empty:
+                break
+            if lead is None: # Stopping at the shutdown sentinel
+                break
+            batch.append(lead)
+        return batch
+        
+    def close(self):
+        # Waking up any blocked consumers with a sentinel so they can shut down
+        for q in (self.verification_queue, self.outreach_queue):
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                pass # A full queue never blocks its consumer
         
-    def get_outreach_task(self):
-        # Getting next outreach lead if available
-        return self.outreach_queue.get() if not self.outreach_queue.empty() else None
+    @staticmethod
+    def _get(q, timeout):
+        # Blocking on the queue until a task arrives, the timeout expires or shutdown
+        try:
+            return q.get(timeout=timeout)
+        except queue.Empty:
+            return None
 
 class EmailValidator:
     """Dedicated email validation class with extendable functionality"""
     def __init__(self):
         # Loading disposable email domains
         self.disposable_domains = self._load_disposable_domains()
+        # Caching MX results per domain as domain -> (has_mx, expires_at)
+        self._mx_cache = OrderedDict()
+        self._mx_lock = threading.Lock()
+        # Event loop running async MX lookups on a dedicated thread, started on first use
+        self._loop = None
+        self._loop_lock = threading.Lock()
         
     def _load_disposable_domains(self):
-        # Setting of known disposable email domains
-        return {"example.com", "mailinator.com", "tempmail.net", "company.com", "test.com", "business.com"}
+        # Setting of known disposable email domains, interned to save memory when the list grows large
+        source = ("example.com", "mailinator.com", "tempmail.net", "company.com", "test.com", "business.com")
+        return frozenset(sys.intern(domain) for domain in source)
     
     def _check_syntax(self, email):
         # Validateing email format using regex
-        return re.match(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$", email)
+        return bool(EMAIL_SYNTAX.fullmatch(email))
     
     def _is_disposable(self, email):
-        # Checking if the email domain is in the disposable list
-        domain = email.split("@")[-1].lower()
-        return domain in self.disposable_domains
+        # Checking if the email domain, or its parent domain, is in the disposable list
+        domain = email.rpartition("@")[2].lower()
+        if domain in self.disposable_domains:
+            return True
+        apex = ".".join(domain.rsplit(".", 2)[-2:]) # Covering subdomains like mail.mailinator.com
+        return apex in self.disposable_domains
     
     def _check_mx_records(self, email):
         # Verifying if the domain has MX records (valid mail server)
-        domain = email.split("@")[-1]
+        domain = email.rpartition("@")[2].lower()
+        cached = self._get_cached_mx(domain)
+        if cached is not None:
+            return cached
         try:
-            return bool(dns.resolver.resolve(domain, "MX"))
+            answer = dns.resolver.resolve(domain, "MX")
         except Exception:
-            return False
+            answer = None
+        return self._store_mx_answer(domain, answer)
+    
+    async def _check_domain_mx_async(self, domain):
+        # Verifying MX records without blocking, so many lookups share one thread
+        cached = self._get_cached_mx(domain)
+        if cached is not None:
+            return cached
+        try:
+            answer = await dns.asyncresolver.resolve(domain, "MX")
+        except Exception:
+            answer = None
+        return self._store_mx_answer(domain, answer)
+    
+    def _store_mx_answer(self, domain, answer):
+        # Caching an MX answer (None for a failed lookup) and returning whether the domain has MX records
+        if answer is None:
+            has_mx = False
+            ttl = MX_NEGATIVE_TTL
+        else:
+            has_mx = bool(answer)
+            ttl = answer.rrset.ttl if answer.rrset is not None else MX_DEFAULT_TTL
+        self._cache_mx(domain, has_mx, ttl)
+        return has_mx
+    
+    async def _gather_mx_records(self, domains):
+        # Running the MX lookups for all domains concurrently
+        return await asyncio.gather(*(self._check_domain_mx_async(domain) for domain in domains))
+    
+    def _get_loop(self):
+        # Starting the resolver event loop thread the first time it is needed
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="mx-resolver", daemon=True).start()
+            return self._loop
+    
+    def _get_cached_mx(self, domain):
+        # Returning the cached MX result for the domain, or None if missing or expired
+        with self._mx_lock:
+            entry = self._mx_cache.get(domain)
+            if entry is None:
+                return None
+            has_mx, expires_at = entry
+            if expires_at <= time.time():
+                del self._mx_cache[domain]
+                return None
+            self._mx_cache.move_to_end(domain) # Marking as recently used
+            return has_mx
+    
+    def _cache_mx(self, domain, has_mx, ttl):
+        # Storing the MX result and evicting the least recently used domain when full
+        with self._mx_lock:
+            self._mx_cache[domain] = (has_mx, time.time() + ttl)
+            self._mx_cache.move_to_end(domain)
+            if len(self._mx_cache) > MX_CACHE_SIZE:
+                self._mx_cache.popitem(last=False)
         
     def validate(self, email):
         # Checking if email format is valid
@@ -121,13 +309,53 @@ class EmailValidator:
             return False
         # Verifying if the domain has MX records
         return self._check_mx_records(email)
+    
+    def validate_many(self, emails):
+        """Validating a batch of emails, looking up each distinct domain's MX records once.
+        
+        Returns a list of booleans in the same order as emails.
+        """
+        results = [False] * len(emails)
+        # Running the cheap syntax and disposable checks first and grouping survivors by domain
+        positions_by_domain = {}
+        for position, email in enumerate(emails):
+            if self._check_syntax(email) and not self._is_disposable(email):
+                domain = email.rpartition("@")[2].lower()
+                positions_by_domain.setdefault(domain, []).append(position)
+        
+        # Answering cached domains directly and resolving the rest concurrently
+        resolved = {}
+        unresolved = []
+        for domain in positions_by_domain:
+            cached = self._get_cached_mx(domain)
+            if cached is None:
+                unresolved.append(domain)
+            else:
+                resolved[domain] = cached
+        if unresolved:
+            future = asyncio.run_coroutine_threadsafe(self._gather_mx_records(unresolved), self._get_loop())
+            resolved.update(zip(unresolved, future.result()))
+        
+        for domain, positions in positions_by_domain.items():
+            for position in positions:
+                results[position] = resolved[domain]
+        return results
+
+# Sharing one validator, and so one MX cache and resolver loop, across all threads
+EMAIL_VALIDATOR = EmailValidator()
 
 class CRMHandler:
     """Handles interactions with a CRM system using Google Sheets and Gmail."""
     def __init__(self, creds_file, sheet_key, worksheet_name):
         self.setup_credentials(creds_file, sheet_key, worksheet_name)
-        self.email_validator = EmailValidator()
         self.last_processed_row = 1
+        
+        # Buffering lead writes so several leads share one Sheets request
+        self._pending_cells = []
+        self._pending_callbacks = []
+        self._pending_leads = 0
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.time()
     
         
     def setup_credentials(self, creds_file, sheet_key, worksheet_name):
@@ -149,6 +377,10 @@ class CRMHandler:
             client = gspread.authorize(creds)
             self.sheet = client.open_by_key(sheet_key).worksheet(worksheet_name)
             
+            # Caching column headers so updates don't re-read the header row
+            self._header_lock = threading.Lock()
+            self.refresh_headers()
+            
             # Initializing Gmail client
             self.gmail = Gmail(creds)
             
@@ -156,63 +388,184 @@ class CRMHandler:
             logger.error(f"Failed to setup credentials: {str(e)}")
             raise
 
-    def get_leads(self):
-        # Retrieveing all lead records from the sheet.
-        return self.sheet.get_all_records()
+    def get_lead_columns(self):
+        # Retrieveing all lead data as a dict of column name -> list of values
+        headers, rows = self._read_rows(2)
+        return {header: [row[idx] for row in rows] for idx, header in enumerate(headers)}
     
     def get_new_leads(self):
-        # Fetch new leads that haven't been processed.
-        all_records = self.sheet.get_all_records()
+        # Fetch new leads that haven't been processed, reading only rows past the last processed one
+        start_row = self.last_processed_row + 1
+        headers, rows = self._read_rows(start_row)
+        status_idx = headers.index("Processing Status") if "Processing Status" in headers else None
         return [
-            {"index": idx, "data": record} 
-            for idx, record in enumerate(all_records) 
-            if idx + 2 > self.last_processed_row and not record.get("Processing Status")
+            {"index": start_row - 2 + offset, "data": dict(zip(headers, row))}
+            for offset, row in enumerate(rows)
+            if status_idx is None or not row[status_idx]
+        ]
+    
+    def _read_rows(self, start_row):
+        # Reading the header row and every row from start_row onwards in one batchGet request
+        last_col = gspread.utils.rowcol_to_a1(1, self.sheet.col_count)[:-1] # Last column letter of the grid
+        response = self.sheet.spreadsheet.values_batch_get([
+            gspread.utils.absolute_range_name(self.sheet.title, "1:1"),
+            gspread.utils.absolute_range_name(self.sheet.title, f"A{start_row}:{last_col}")
+        ])
+        header_range, data_range = response.get("valueRanges", [{}, {}])
+        
+        # Refreshing the header cache from the same response in case the schema changed
+        headers = header_range.get("values", [[]])[0]
+        self._set_headers(headers)
+        width = len(headers)
+        rows = [
+            row[:width] + [""] * (width - len(row))
+            for row in data_range.get("values", [])
         ]
+        return headers, rows
 
-    def update_lead(self, row_index, updates):
-        # Updateing lead record with new data
-        headers = self.sheet.row_values(1) # Getting column headers
+    def refresh_headers(self):
+        # Re-reading the header row and rebuilding the column index cache
+        self._set_headers(self.sheet.row_values(1))
+
+    def _set_headers(self, headers):
+        # Replacing the cached column index map
+        with self._header_lock:
+            self._header_index = {header: idx + 1 for idx, header in enumerate(headers)}
+
+    def _column_index(self, col):
+        # Looking up a column index, refreshing the cache once if the schema changed
+        try:
+            return self._header_index[col]
+        except KeyError:
+            self.refresh_headers()
+            return self._header_index[col]
+
+    def _build_cells(self, row_index, updates):
+        # Converting a dict of column updates into single-cell value ranges
         cells = []
         for col, val in updates.items():
             try:
-                col_index = headers.index(col) + 1 # Finding column index
-                cells.append(gspread.Cell(
-                    row=row_index + 2, # Adjusting for header row
-                    col=col_index,
-                    value=val
-                ))
-            except ValueError as e:
+                col_index = self._column_index(col) # Finding column index
+                cell = gspread.utils.rowcol_to_a1(row_index + 2, col_index) # Adjusting for header row
+                cells.append({
+                    "range": gspread.utils.absolute_range_name(self.sheet.title, cell),
+                    "values": [[val]]
+                })
+            except KeyError as e:
                 logger.error(f"Column {col} not found in headers: {str(e)}")
+        return cells
+
+    def _write_cells(self, cells):
+        # Writing value ranges in one values.batchUpdate call, storing values as-is
+        self.sheet.spreadsheet.values_batch_update(body={
+            "valueInputOption": "RAW",
+            "data": cells
+        })
+
+    def update_lead(self, row_index, updates):
+        # Updateing lead record with new data
+        cells = self._build_cells(row_index, updates)
         if cells:
-            self.sheet.update_cells(cells)
+            self._write_cells(cells)
+
+    def queue_update(self, row_index, updates, on_flush=None):
+        # Buffering lead updates and flushing them once enough have accumulated
+        cells = self._build_cells(row_index, updates)
+        with self._pending_lock:
+            self._pending_cells.extend(cells)
+            if on_flush:
+                self._pending_callbacks.append(on_flush)
+            self._pending_leads += 1
+            should_flush = (
+                self._pending_leads >= FLUSH_EVERY_LEADS
+                or time.time() - self._last_flush >= FLUSH_INTERVAL
+            )
+        if should_flush:
+            self.flush_updates()
+
+    def flush_updates(self):
+        # Writing all buffered lead updates in a single request
+        with self._pending_lock:
+            cells, self._pending_cells = self._pending_cells, []
+            callbacks, self._pending_callbacks = self._pending_callbacks, []
+            self._pending_leads = 0
+            self._last_flush = time.time()
+        try:
+            if cells:
+                self._write_cells(cells)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(cells)} lead updates: {str(e)}")
+            # Putting the writes back ahead of newer ones so the next flush retries them;
+            # the interval restarts from now, which backs off quota errors
+            with self._pending_lock:
+                self._pending_cells[:0] = cells
+                self._pending_callbacks[:0] = callbacks
+            return
+        # Running follow-up actions only once their updates have been written
+        for callback in callbacks:
+            callback()
 
     def validate_email(self, email):
         # Validating an email address using EmailValidator
-        return self.email_validator.validate(email)
+        return EMAIL_VALIDATOR.validate(email)
+
+    def validate_emails(self, emails):
+        # Validating a batch of email addresses in one go using EmailValidator
+        return EMAIL_VALIDATOR.validate_many(emails)
 
-class AgentA(CRMHandler):
+class AgentA:
     """Agent responsible for processing lead verification tasks"""
-    def __init__(self, creds_file, sheet_key, worksheet_name, task_queue):
-        super().__init__(creds_file, sheet_key, worksheet_name)
+    def __init__(self, crm, task_queue, max_workers=VERIFICATION_WORKERS, batch_size=VERIFICATION_BATCH_SIZE):
+        self.crm = crm # Shared CRM handler
         self.task_queue = task_queue
+        self.max_workers = max_workers # Number of per-lead lookups run concurrently when batch validation fails
+        self.batch_size = batch_size # Number of leads whose emails are validated together
         self.running = False
         
     def start_processing(self):
-        """Continuously fetching and processing verification tasks."""
+        """Continuously fetching verification tasks and processing them in batches."""
         self.running = True
-        while self.running:
-            lead = self.task_queue.get_verification_task() # Fetching a lead from the queue
-            if lead:
-                self.process_lead(lead) # Processing the lead
-            time.sleep(1) # Preventing excessive CPU usage
+        # Worker threads are only started if batch validation fails and leads fall back to blocking lookups
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self.running:
+                # Blocking until leads arrive instead of polling
+                leads = self.task_queue.get_verification_batch(self.batch_size)
+                if not leads:
+                    self.crm.flush_updates() # Writing buffered updates while idle
+                    continue
+                validity = self.validate_batch(leads)
+                if validity is None:
+                    self.process_leads_concurrently(executor, leads)
+                    continue
+                # Emails are already validated, so the remaining per-lead work is cheap
+                for lead, is_valid in zip(leads, validity):
+                    self.process_lead(lead, is_valid)
+        self.crm.flush_updates()
+        
+    def process_leads_concurrently(self, executor, leads):
+        """Validating leads one by one on the worker pool so their DNS lookups overlap."""
+        futures = {executor.submit(self.process_lead, lead): lead for lead in leads}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                lead = futures[future]
+                logger.error(f"Verification worker failed for {lead['data'].get('Email')}: {str(e)}")
+        
+    def validate_batch(self, leads):
+        """Validating the emails of a batch of leads at once, returning None if the batch check fails."""
+        try:
+            return self.crm.validate_emails([lead["data"].get("Email", "") for lead in leads])
+        except Exception as e:
+            logger.error(f"Batch email validation failed: {str(e)}")
+            return None # Leaving validation to each lead
                 
-    def process_lead(self, lead):
+    def process_lead(self, lead, is_valid=None):
         """Validating and verifying a lead, updating the CRM accordingly."""
         try:
-            self.update_lead(lead["index"], {"Processing Status": "Verifying"}) # Marking as verifying
-            
-            # Validating email and perform additional checks
-            is_valid = self.validate_email(lead["data"]["Email"])
+            # Validating email unless already checked in a batch, and perform additional checks
+            if is_valid is None:
+                is_valid = self.crm.validate_email(lead["data"]["Email"])
             additional_checks_passed = self.perform_additional_checks(lead["data"])
             
             verification_status = "Y" if (is_valid and additional_checks_passed) else "N"
@@ -224,15 +577,15 @@ class AgentA(CRMHandler):
                 "Verification Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            self.update_lead(lead["index"], updates)
-            
-            # If verified, adding the lead to the outreach queue
+            # If verified, adding the lead to the outreach queue once the status is written
+            on_flush = None
             if verification_status == "Y":
-                self.task_queue.add_outreach_task(lead)
+                on_flush = lambda: self.task_queue.add_outreach_task(lead)
+            self.crm.queue_update(lead["index"], updates, on_flush=on_flush)
                 
         except Exception as e:
             logger.error(f"Error processing lead {lead['data'].get('Email')}: {str(e)}")
-            self.update_lead(lead["index"], {
+            self.crm.queue_update(lead["index"], {
                 "Processing Status": "Error",
                 "Notes": f"Verification failed: {str(e)}"
             })
@@ -259,46 +612,84 @@ class AgentA(CRMHandler):
         ]
         return all(checks) # Passes only if all checks return True
 
-class AgentB(CRMHandler):
+class AgentB:
     """Agent responsible for processing outreach tasks, including email sending and retries."""
-    def __init__(self, creds_file, sheet_key, worksheet_name, smtp_config, task_queue):
-        super().__init__(creds_file, sheet_key, worksheet_name)
+    def __init__(self, crm, smtp_config, task_queue):
+        self.crm = crm # Shared CRM handler
         self.smtp_config = smtp_config # SMTP configuration for sending emails
         self.task_queue = task_queue # Shared task queue for outreach tasks
         self.running = False # Controlling flag for processing loop
-        self.retry_queue = queue.Queue() # Queuing for retrying failed email attempts
+        self.retry_queue = queue.PriorityQueue() # Failed emails ordered by when they are due for retry
+        self._retry_sequence = itertools.count() # Tie-breaker so leads are never compared
+        self._smtp_local = threading.local() # Persistent SMTP connection per thread
+        self._smtp_connections = set() # Every open connection, for closing on shutdown
+        self._smtp_lock = threading.Lock()
+        
+        # Sending emails concurrently while bounding how many leads are in flight
+        max_workers = self.smtp_config.get("max_workers", OUTREACH_WORKERS)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._in_flight = threading.BoundedSemaphore(max_workers * 2)
         
     def start_processing(self):
         """Continuously processing outreach tasks and retry failed emails."""
         self.running = True
         while self.running:
             self.process_retry_queue() # Handleing failed email attempts first
-            lead = self.task_queue.get_outreach_task() # Fetching a lead for outreach
+            lead = self.task_queue.get_outreach_task() # Blocking until a lead arrives for outreach
             if lead:
-                self.process_lead(lead) # Processing the outreach
-            time.sleep(1) # Preventing excessive CPU usage
+                self._submit(lead) # Processing the outreach on a worker thread
+            else:
+                self.crm.flush_updates() # Writing buffered updates while idle
+        self._executor.shutdown(wait=True)
+        self.crm.flush_updates()
+        self._close_all_smtp_connections()
+        
+    def _submit(self, lead):
+        """Handing a lead to the sender pool, waiting while too many sends are in flight."""
+        self._submit_attempt(lead, 0)
+        
+    def _submit_attempt(self, lead, attempts):
+        """Submitting a send attempt for a lead that has already failed attempts times."""
+        self._in_flight.acquire()
+        future = self._executor.submit(self.process_lead, lead, attempts)
+        future.add_done_callback(lambda _: self._in_flight.release())
                 
     def process_retry_queue(self):
-        """Retrying sending emails for leads that previously failed (up to 3 attempts)."""
-        while not self.retry_queue.empty():
-            lead, attempts = self.retry_queue.get()
-            if attempts < 3:
-                success = self.send_email(lead["data"]) # Attempting to send email again
-                if not success:
-                    self.retry_queue.put((lead, attempts + 1)) # Re-adding to queue with incremented attempt count
+        """Resubmitting failed emails whose backoff delay has elapsed."""
+        while True:
+            try:
+                entry = self.retry_queue.get_nowait()
+            except queue.Empty:
+                return
+            ready_at, attempts, _, lead = entry
+            if ready_at > time.time():
+                self.retry_queue.put(entry) # Earliest retry isn't due yet
+                return
+            self._submit_attempt(lead, attempts) # Attempting to send email again
+            
+    def schedule_retry(self, lead, attempts):
+        """Scheduling another send with exponential backoff, or failing the lead after the last attempt."""
+        if attempts >= MAX_SEND_ATTEMPTS:
+            logger.error(f"Giving up on outreach to {lead['data'].get('Email')} after {attempts} attempts")
+            self.crm.queue_update(lead["index"], {
+                "Processing Status": "Error",
+                "Notes": f"Outreach failed after {attempts} attempts"
+            })
+            return
+        ready_at = time.time() + 2 ** attempts + random.uniform(0, 1) # Backing off with jitter
+        self.retry_queue.put((ready_at, attempts, next(self._retry_sequence), lead))
                     
-    def process_lead(self, lead):
+    def process_lead(self, lead, attempts=0):
         """Sending outreach email and update CRM accordingly."""
         try:
-            self.update_lead(lead["index"], {"Processing Status": "Outreach"}) # Marking as outreach in progress
             success = self.send_email(lead["data"]) # Sending the outreach email
             
             if not success:
-                self.retry_queue.put((lead, 1)) # Adding to retry queue if sending fails
+                self.schedule_retry(lead, attempts + 1) # Adding to retry queue if sending fails
                 return
 
             # Updating lead status after successful email    
-            self.update_lead(lead["index"], {
+            self.crm.queue_update(lead["index"], {
                 "Processing Status": "Completed",
                 "Response Status": "Pending Response",
                 "Outreach Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -306,7 +697,7 @@ class AgentB(CRMHandler):
             
         except Exception as e:
             logger.error(f"Error in outreach to {lead['data'].get('Email')}: {str(e)}")
-            self.update_lead(lead["index"], {
+            self.crm.queue_update(lead["index"], {
                 "Processing Status": "Error",
                 "Notes": f"Outreach failed: {str(e)}"
             })
@@ -319,45 +710,140 @@ class AgentB(CRMHandler):
         msg["To"] = lead["Email"] # Recipient email
         
         try:
-            # Establishing SMTP connection and send email
-            with smtplib.SMTP(self.smtp_config["server"], self.smtp_config["port"]) as server:
-                server.starttls() # Securing the connection
-                server.login(self.smtp_config["email"], self.smtp_config["password"]) # Authentication
-                server.send_message(msg) # Sending email
-            return True
+            # Reusing this thread's SMTP connection, reconnecting once if it was dropped
+            for attempt in range(2):
+                server = self._get_smtp_connection()
+                try:
+                    server.send_message(msg) # Sending email
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException):
+                    self._close_smtp_connection()
+                    if attempt:
+                        raise
+                    continue
+                self._smtp_local.sent += 1
+                self._smtp_local.last_used = time.time()
+                return True
         except Exception as e:
             logger.error(f"Failed to send email to {lead['Email']}: {str(e)}")
             return False
+    
+    def _get_smtp_connection(self):
+        """Returning this thread's SMTP connection, opening a new one if needed."""
+        conn = getattr(self._smtp_local, "conn", None)
+        if conn is not None:
+            if self._smtp_local.sent >= SMTP_MESSAGES_PER_CONNECTION:
+                self._close_smtp_connection() # Respecting per-connection message limits
+            elif time.time() - self._smtp_local.last_used >= SMTP_IDLE_CHECK:
+                try:
+                    conn.noop() # Checking an idle connection is still alive
+                except (smtplib.SMTPException, OSError):
+                    self._close_smtp_connection()
+        if getattr(self._smtp_local, "conn", None) is None:
+            conn = smtplib.SMTP(self.smtp_config["server"], self.smtp_config["port"])
+            try:
+                conn.starttls() # Securing the connection
+                conn.login(self.smtp_config["email"], self.smtp_config["password"]) # Authentication
+            except Exception:
+                conn.close() # Dropping the half-opened connection before reporting the failure
+                raise
+            self._smtp_local.conn = conn
+            with self._smtp_lock:
+                self._smtp_connections.add(conn)
+            self._smtp_local.sent = 0
+            self._smtp_local.last_used = time.time()
+        return self._smtp_local.conn
+    
+    def _close_smtp_connection(self):
+        """Closing this thread's SMTP connection if one is open."""
+        conn = getattr(self._smtp_local, "conn", None)
+        self._smtp_local.conn = None
+        if conn is not None:
+            self._quit_smtp_connection(conn)
+    
+    def _close_all_smtp_connections(self):
+        """Closing the SMTP connections left open by every sender thread."""
+        with self._smtp_lock:
+            connections = list(self._smtp_connections)
+        for conn in connections:
+            self._quit_smtp_connection(conn)
+    
+    def _quit_smtp_connection(self, conn):
+        """Politely ending an SMTP session, dropping the socket if that fails."""
+        with self._smtp_lock:
+            self._smtp_connections.discard(conn)
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
 
-class Supervisor(CRMHandler):
+class Supervisor:
     """Supervisor class responsible for monitoring leads, email tasks, and generating reports."""
-    def __init__(self, creds_file, sheet_key, worksheet_name, task_queue):
-        super().__init__(creds_file, sheet_key, worksheet_name)
+    def __init__(self, crm, task_queue):
+        self.crm = crm # Shared CRM handler
         self.task_queue = task_queue # Shared task queue for assigning verification tasks
         self.running = False # Control flag for the monitoring process
+        self._stop_event = threading.Event() # Waking the monitor early on shutdown
+        self._report_timer = None # Timer for the next scheduled report
         
     def start_monitoring(self):
         """Continuously monitoring new leads and email tasks at regular intervals."""
         self.running = True
+        self._stop_event.clear()
         while self.running:
             self.monitor_new_leads() # Checking for new leads
             self.monitor_email_tasks() # Checking for new email tasks
-            time.sleep(300) # Sleeping for 5 minutes before the next monitoring cycle
+            self._stop_event.wait(300) # Sleeping for 5 minutes before the next monitoring cycle
+            
+    def stop(self):
+        """Stopping the monitoring loop without waiting for the current sleep to finish."""
+        self.running = False
+        self._stop_event.set()
+        if self._report_timer is not None:
+            self._report_timer.cancel()
+            
+    def schedule_daily_report(self, recipient, smtp_config, at="16:00"):
+        """Scheduling the report to be sent every day at the given HH:MM time."""
+        hour, minute = map(int, at.split(":"))
+        now = datetime.now()
+        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        # Sleeping until the next run instead of waking up to check a schedule
+        self._report_timer = threading.Timer(
+            (next_run - now).total_seconds(),
+            self._fire_report,
+            args=(recipient, smtp_config, at)
+        )
+        self._report_timer.daemon = True
+        self._report_timer.start()
+        
+    def _fire_report(self, recipient, smtp_config, at):
+        """Sending the scheduled report and scheduling the next one."""
+        try:
+            self.send_report(recipient, smtp_config)
+        except Exception as e:
+            logger.error(f"Scheduled report failed: {str(e)}")
+        finally:
+            if not self._stop_event.is_set():
+                self.schedule_daily_report(recipient, smtp_config, at)
             
     def monitor_new_leads(self):
         """Fetches new leads and assigns them for verification."""
         try:
-            new_leads = self.get_new_leads() # Retrieving newly added leads
+            new_leads = self.crm.get_new_leads() # Retrieving newly added leads
             for lead in new_leads:
-                self.task_queue.add_verification_task(lead) # Assigning lead to verification queue
-                self.last_processed_row = lead["index"] + 2 # Updating the last processed row
+                # Assigning lead to verification queue, waiting for space without blocking shutdown
+                while not self.task_queue.add_verification_task(lead, timeout=1.0):
+                    if self._stop_event.is_set():
+                        return # Leaving unqueued leads to be re-read on the next run
+                self.crm.last_processed_row = lead["index"] + 2 # Updating the last processed row
         except Exception as e:
             logger.error(f"Error monitoring leads: {str(e)}")
             
     def monitor_email_tasks(self):
         """Checking for unread emails with campaign tasks and processes them."""
         try:
-            messages = self.gmail.get_unread_messages(
+            messages = self.crm.gmail.get_unread_messages(
                 query="subject:New Campaign Task"
             ) # Fetching unread emails related to campaign tasks
             for msg in messages:
@@ -371,21 +857,21 @@ class Supervisor(CRMHandler):
 
     def generate_report(self):
         """Generating a summary report of lead verification and responses."""
-        leads = self.get_leads() # Fetching all leads from the CRM
+        columns = self.crm.get_lead_columns() # Fetching all leads from the CRM column by column
+        total_leads = len(next(iter(columns.values()), []))
+        # Counting each column's values in a single pass
+        verified = Counter(columns.get("Email Verified (Y/N)", ()))
+        responses = Counter(columns.get("Response Status", ()))
+        if "Response Status" not in columns:
+            responses["No Response"] = total_leads # Treating a missing column as no responses
         report = {
-            "total_leads": len(leads), # Total number of leads
-            "verified": sum(1 for l in leads if l.get("Email Verified (Y/N)") == "Y"),
+            "total_leads": total_leads, # Total number of leads
+            "verified": verified["Y"],
             "responses": {
-                "Interested": 0,
-                "Not Interested": 0,
-                "No Response": 0
+                status: responses[status]
+                for status in ("Interested", "Not Interested", "No Response")
             }
         }
-        # Categorizing responses from the lead data
-        for lead in leads:
-            status = lead.get("Response Status", "No Response")
-            if status in report["responses"]:
-                report["responses"][status] += 1
         
         return report # Returning the report as a dictionary
 
@@ -439,10 +925,11 @@ def main():
 
     # Initializing components
     task_queue = TaskQueue()
+    crm = CRMHandler(GOOGLE_CREDS, SHEET_KEY, WORKSHEET) # One set of clients and caches for all agents
     
-    supervisor = Supervisor(GOOGLE_CREDS, SHEET_KEY, WORKSHEET, task_queue)
-    agent_a = AgentA(GOOGLE_CREDS, SHEET_KEY, WORKSHEET, task_queue)
-    agent_b = AgentB(GOOGLE_CREDS, SHEET_KEY, WORKSHEET, SMTP_CONFIG, task_queue)
+    supervisor = Supervisor(crm, task_queue)
+    agent_a = AgentA(crm, task_queue)
+    agent_b = AgentB(crm, SMTP_CONFIG, task_queue)
     
     # Starting processing threads
     threads = [
@@ -455,21 +942,21 @@ def main():
         thread.start()
         
     # Scheduling regular reports
-    schedule.every().day.at("16:00").do(
-        supervisor.send_report,
-        manager_email,
-        SMTP_CONFIG
-    )
+    supervisor.schedule_daily_report(manager_email, SMTP_CONFIG, at="16:00")
     
     try:
+        # Sleeping until interrupted; signal.pause is unavailable on Windows
         while True:
-            schedule.run_pending()
-            time.sleep(60)
+            if hasattr(signal, "pause"):
+                signal.pause()
+            else:
+                time.sleep(3600)
     except KeyboardInterrupt:
         # Graceful shutdown on user interruption (Ctrl+C)
-        supervisor.running = False
+        supervisor.stop()
         agent_a.running = False
         agent_b.running = False
+        task_queue.close() # Unblocking agents waiting on empty queues
         
         for thread in threads:
             thread.join()